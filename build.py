@@ -0,0 +1,47 @@
+"""
+Build the optional compiled extension(s) used to speed up scan scaling.
+
+If the extension(s) can't be built, e.g. Cython or a C compiler isn't available, installation
+continues & the pure-Python implementations are used instead.
+"""
+from setuptools import Extension
+from setuptools.command.build_ext import build_ext
+from setuptools.errors import CCompilerError, ExecError, PlatformError
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+
+class OptionalBuildExt(build_ext):
+    """Allow compilation of the extension(s) to fail without failing the overall build."""
+
+    def run(self) -> None:
+        """Build all extensions, skipping them entirely if no compiler is available."""
+        try:
+            super().run()
+        except PlatformError:
+            print("Unable to build compiled extension(s), falling back to pure-Python")
+
+    def build_extension(self, ext: Extension) -> None:
+        """Build the provided extension, skipping it if compilation fails."""
+        try:
+            super().build_extension(ext)
+        except (CCompilerError, ExecError, PlatformError, ValueError):
+            print(f"Unable to build {ext.name}, falling back to pure-Python")
+
+
+def build(setup_kwargs: dict) -> None:
+    """Add the compiled extension(s) to the setup keyword arguments provided by Poetry."""
+    if cythonize is None:
+        print("Cython is not available, falling back to pure-Python")
+        return
+
+    setup_kwargs.update(
+        {
+            # Keep the generated C source out of the package directory so it isn't shipped
+            "ext_modules": cythonize("scan_scaler/_fast_io.pyx", build_dir="build"),
+            "cmdclass": {"build_ext": OptionalBuildExt},
+        }
+    )
@@ -0,0 +1,81 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled implementation of the vertex block ASCII -> float conversion.
+
+See `scan_scaler.vertex_parser.parse_vertex_block` for the NumPy/pandas equivalent, which is used
+if this extension is not built.
+"""
+import numpy as np
+
+from libc.stdlib cimport strtof
+
+
+cdef inline bint is_space(char c) nogil:
+    return c == b" " or c == b"\t" or c == b"\r" or c == b"\v" or c == b"\f"
+
+
+def parse_vertices(bytes block, int skip, int n_values):
+    """
+    Parse the provided whitespace-delimited vertex `block` into an `(N, n_values)` float32 array.
+
+    For each line, the first `skip` tokens are ignored & the following `n_values` tokens are parsed
+    as floats; any remaining tokens on the line are ignored. Blank lines are skipped. A `ValueError`
+    is raised if a line is short of values or a value isn't a whitespace-delimited float.
+
+    NOTE: `strtof` respects the C `LC_NUMERIC` locale, so callers are responsible for only using
+    this when the locale's decimal point is `"."`.
+    """
+    # Every vertex line ends in a newline, except possibly the last. Blank lines are trimmed off
+    # after parsing.
+    vertices = np.empty((block.count(b"\n") + 1, n_values), dtype=np.float32)
+    cdef float[:, ::1] out = vertices
+
+    # bytes objects are always NUL terminated, so strtof can't run off the end of the block
+    cdef const char *pos = block
+    cdef const char *end = pos + len(block)
+    cdef char *endptr
+    cdef Py_ssize_t row = 0
+    cdef int i
+    while pos < end:
+        while pos < end and is_space(pos[0]):
+            pos += 1
+
+        if pos >= end:
+            break
+
+        if pos[0] == b"\n":
+            pos += 1
+            continue
+
+        for i in range(skip):
+            while pos < end and not is_space(pos[0]) and pos[0] != b"\n":
+                pos += 1
+            while pos < end and is_space(pos[0]):
+                pos += 1
+
+        for i in range(n_values):
+            # strtof skips leading whitespace itself, so don't let it run into the next line
+            while pos < end and is_space(pos[0]):
+                pos += 1
+            if pos >= end or pos[0] == b"\n":
+                raise ValueError(f"Vertex line {row + 1} contains fewer than {n_values} values")
+
+            out[row, i] = strtof(pos, &endptr)
+
+            # Numbers must be whitespace delimited, otherwise e.g. "1-2" would parse as [1, -2]
+            if (
+                endptr == pos
+                or endptr > end
+                or (endptr < end and not is_space(endptr[0]) and endptr[0] != b"\n")
+            ):
+                raise ValueError(f"Could not convert vertex line {row + 1} to floats")
+            pos = endptr
+
+        row += 1
+
+        # Discard anything else on the line
+        while pos < end and pos[0] != b"\n":
+            pos += 1
+        pos += 1
+
+    return vertices[:row]
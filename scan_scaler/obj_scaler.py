@@ -1,8 +1,30 @@
+import mmap
+import shutil
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, NamedTuple
-
-
-class ObjFile(NamedTuple):
+from typing import List
+
+import numpy as np
+from scan_scaler.vertex_parser import (
+    OUTPUT_BUFFER_SIZE,
+    VERTEX_DTYPE,
+    VERTEX_TILE_SIZE,
+    decode_lines,
+    find_line_starts,
+    format_vertices,
+    join_lines,
+    normalize_newlines,
+    parse_vertex_block,
+    write_scaled_vertices,
+)
+
+# X, Y, Z are output to 5 significant figures
+VERTEX_FORMAT = "v %.5g %.5g %.5g"
+
+
+@dataclass(eq=False)
+class ObjFile:
     """
     Provide a simple representative container of the contents of an OBJ file.
 
@@ -10,14 +32,31 @@ class ObjFile(NamedTuple):
     remaining lines back in as-is.
     """
 
+    # Declared by hand rather than via dataclass(slots=True), which requires Python 3.10+
+    __slots__ = ("header", "vertices", "faces")
+
     header: List[str]
-    vertices: List[List[float]]  # Represented as a list of [X, Y, Z] floats
+    vertices: np.ndarray  # Represented as an (N, 3) array of [X, Y, Z] floats
     faces: List[str]
 
+    def __post_init__(self) -> None:
+        # Vertices are always held in single precision, whatever they were provided as
+        self.vertices = np.asarray(self.vertices, dtype=VERTEX_DTYPE)
+
+    def __eq__(self, other: object) -> bool:
+        # The generated __eq__ can't compare arrays, so compare vertices element-wise ourselves
+        if not isinstance(other, ObjFile):
+            return NotImplemented
+
+        return (
+            self.header == other.header
+            and np.array_equal(self.vertices, other.vertices)
+            and self.faces == other.faces
+        )
+
     def scale_vertices(self, factor: float = 1000) -> None:
         """Scale all vertices by the provided `factor`."""
-        for idx, vertex in enumerate(self.vertices):
-            self.vertices[idx] = [(coord * factor) for coord in vertex]
+        self.vertices *= factor
 
     def to_file(self, out_filepath: Path) -> None:
         """
@@ -25,15 +64,18 @@ class ObjFile(NamedTuple):
 
         NOTE: If `out_filepath` already exists, all existing contents will be overwritten.
         """
-        with out_filepath.open(mode="w") as f:
+        with out_filepath.open(mode="wb", buffering=OUTPUT_BUFFER_SIZE) as f:
             # Write headers straight back
-            f.write("".join(header for header in self.header))
+            f.write("".join(self.header).encode())
 
             # Prepend vertices with "v" before dumping back
-            f.write("".join(self.vertex_to_string(vertex) for vertex in self.vertices))
+            # Format a tile of vertices at a time rather than each vertex individually
+            for start in range(0, len(self.vertices), VERTEX_TILE_SIZE):
+                stop = start + VERTEX_TILE_SIZE
+                f.write(format_vertices(self.vertices[start:stop], VERTEX_FORMAT))
 
             # Write faces straight back
-            f.write("".join(face for face in self.faces))
+            f.write("".join(self.faces).encode())
 
     def add_header_comment(self, header_comment: str) -> None:
         """
@@ -44,13 +86,13 @@ class ObjFile(NamedTuple):
         self.header.append(f"# {header_comment}\n")
 
     @staticmethod
-    def vertex_to_string(vertex: List[float]) -> str:
+    def vertex_to_string(vertex: np.ndarray) -> str:
         """
         Convert the provided vertex into its string representation.
 
         e.g. [1, 2, 3] -> "v 1 2 3\n"
         """
-        return f"v {vertex[0]:.5} {vertex[1]:.5} {vertex[2]:.5}\n"
+        return f"{VERTEX_FORMAT % tuple(vertex)}\n"
 
 
 def parse_obj(filepath: Path) -> ObjFile:
@@ -62,16 +104,71 @@ def parse_obj(filepath: Path) -> ObjFile:
         v <vertex line(s)>
         f <face line(s)>
     """
-    header = []
-    vertices = []
-    faces = []
-    with filepath.open(mode="r") as f:
-        for line in f:
-            if line.startswith("#"):
-                header.append(line)
-            elif line.startswith("v"):
-                vertices.append([float(vertex) for vertex in line.split()[1:]])
-            elif line.startswith("f"):
-                faces.append(line)
+    # Empty files can't be memory-mapped
+    if filepath.stat().st_size == 0:
+        return ObjFile([], parse_vertex_block(b"", usecols=(1, 2, 3)), [])
+
+    with filepath.open(mode="rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Classify every line by its leading character in bulk, rather than splitting out each line
+        line_starts = find_line_starts(mm)
+        line_types = np.frombuffer(mm, dtype=np.uint8)[line_starts]
+
+        # OBJ files don't declare their vertex count up front, so collect the raw lines & bulk
+        # parse them once we're done, skipping the leading "v"
+        header = decode_lines(join_lines(mm, line_starts, line_types == ord("#")))
+        vertices = parse_vertex_block(
+            join_lines(mm, line_starts, line_types == ord("v")), usecols=(1, 2, 3)
+        )
+        faces = decode_lines(join_lines(mm, line_starts, line_types == ord("f")))
 
     return ObjFile(header, vertices, faces)
+
+
+def transform_obj(
+    in_filepath: Path, out_filepath: Path, factor: float, header_comment: str
+) -> None:
+    """
+    Scale the vertices of the OBJ file at `in_filepath` by `factor` & write it to `out_filepath`.
+
+    This is equivalent to parsing, scaling, commenting, and writing an `ObjFile`, but is done in a
+    streaming fashion so the full vertex array is never held in memory. As with `parse_obj`, the
+    OBJ file is assumed to be of the form:
+        # <header line(s)>
+        v <vertex line(s)>
+        f <face line(s)>
+
+    Output matches `ObjFile.to_file`: all comment lines are grouped into the header, followed by the
+    header comment, all vertices, then all faces. Lines of any other type are dropped & line endings
+    are normalized to `"\\n"`. Since comments need to be written ahead of the vertices, they're
+    picked out in a first pass over the input file; vertices are then streamed out in a second pass,
+    with faces spooled to a temporary file & appended once the vertices are done.
+
+    NOTE: If `out_filepath` already exists, all existing contents will be overwritten.
+    """
+    with in_filepath.open(mode="rb") as in_f, out_filepath.open(
+        mode="wb", buffering=OUTPUT_BUFFER_SIZE
+    ) as out_f, tempfile.TemporaryFile() as faces_f:
+        for line in in_f:
+            if line.startswith(b"#"):
+                out_f.write(normalize_newlines(line))
+
+        out_f.write(f"# {header_comment}\n".encode())
+
+        in_f.seek(0)
+        vertex_lines = []
+        for line in in_f:
+            if line.startswith(b"v"):
+                vertex_lines.append(line)
+                if len(vertex_lines) == VERTEX_TILE_SIZE:
+                    write_scaled_vertices(
+                        out_f, b"".join(vertex_lines), (1, 2, 3), factor, VERTEX_FORMAT
+                    )
+                    vertex_lines = []
+            elif line.startswith(b"f"):
+                faces_f.write(normalize_newlines(line))
+
+        if vertex_lines:
+            write_scaled_vertices(out_f, b"".join(vertex_lines), (1, 2, 3), factor, VERTEX_FORMAT)
+
+        faces_f.seek(0)
+        shutil.copyfileobj(faces_f, out_f, OUTPUT_BUFFER_SIZE)
@@ -1,8 +1,29 @@
+import mmap
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, NamedTuple
-
-
-class PlyFile(NamedTuple):
+from typing import List
+
+import numpy as np
+from scan_scaler.vertex_parser import (
+    OUTPUT_BUFFER_SIZE,
+    VERTEX_DTYPE,
+    VERTEX_TILE_SIZE,
+    copy_normalized,
+    decode_lines,
+    find_line_end,
+    format_vertices,
+    iter_line_blocks,
+    normalize_newlines,
+    parse_vertex_block,
+    write_scaled_vertices,
+)
+
+# X, Y, Z are output to 5 significant figures, confidence is padded to a width of 5
+VERTEX_FORMAT = "%.5g %.5g %.5g %5g"
+
+
+@dataclass(eq=False)
+class PlyFile:
     """
     Provide a simple representative container of the contents of an Ply file.
 
@@ -10,17 +31,32 @@ class PlyFile(NamedTuple):
     remaining lines back in as-is.
     """
 
+    # Declared by hand rather than via dataclass(slots=True), which requires Python 3.10+
+    __slots__ = ("header", "vertices", "faces")
+
     header: List[str]
-    vertices: List[List[float]]  # Represented as a list of [X, Y, Z, confidence] floats
+    vertices: np.ndarray  # Represented as an (N, 4) array of [X, Y, Z, confidence] floats
     faces: List[str]
 
+    def __post_init__(self) -> None:
+        # Vertices are always held in single precision, whatever they were provided as
+        self.vertices = np.asarray(self.vertices, dtype=VERTEX_DTYPE)
+
+    def __eq__(self, other: object) -> bool:
+        # The generated __eq__ can't compare arrays, so compare vertices element-wise ourselves
+        if not isinstance(other, PlyFile):
+            return NotImplemented
+
+        return (
+            self.header == other.header
+            and np.array_equal(self.vertices, other.vertices)
+            and self.faces == other.faces
+        )
+
     def scale_vertices(self, factor: float = 1000) -> None:
         """Scale all vertices by the provided `factor`."""
-        for idx, vertex in enumerate(self.vertices):
-            # Scale only the components, not the confidence
-            confidence = vertex[-1]  # Pull condfidence out so we can tack it back on after scaling
-            self.vertices[idx] = [(coord * factor) for coord in vertex[:-1]]
-            self.vertices[idx].append(confidence)
+        # Scale only the components, not the confidence
+        self.vertices[:, :3] *= factor
 
     def to_file(self, out_filepath: Path) -> None:
         """
@@ -28,15 +64,18 @@ class PlyFile(NamedTuple):
 
         NOTE: If `out_filepath` already exists, all existing contents will be overwritten.
         """
-        with out_filepath.open(mode="w") as f:
+        with out_filepath.open(mode="wb", buffering=OUTPUT_BUFFER_SIZE) as f:
             # Write headers straight back
-            f.write("".join(header for header in self.header))
+            f.write("".join(self.header).encode())
 
-            # Stringify the vertex before dumping back
-            f.write("".join(self.vertex_to_string(vertex) for vertex in self.vertices))
+            # Stringify the vertices before dumping back
+            # Format a tile of vertices at a time rather than each vertex individually
+            for start in range(0, len(self.vertices), VERTEX_TILE_SIZE):
+                stop = start + VERTEX_TILE_SIZE
+                f.write(format_vertices(self.vertices[start:stop], VERTEX_FORMAT))
 
             # Write faces straight back
-            f.write("".join(face for face in self.faces))
+            f.write("".join(self.faces).encode())
 
     def add_header_comment(self, header_comment: str) -> None:
         """
@@ -48,13 +87,13 @@ class PlyFile(NamedTuple):
         self.header.insert(-1, f"comment {header_comment}\n")
 
     @staticmethod
-    def vertex_to_string(vertex: List[float]) -> str:
+    def vertex_to_string(vertex: np.ndarray) -> str:
         """
         Convert the provided vertex into its string representation.
 
         e.g. [1, 2, 3, 4] -> "1 2 3 4\n"
         """
-        return f"{vertex[0]:.5} {vertex[1]:.5} {vertex[2]:.5} {vertex[3]:5}\n"
+        return f"{VERTEX_FORMAT % tuple(vertex)}\n"
 
 
 def parse_ply(filepath: Path) -> PlyFile:
@@ -69,33 +108,66 @@ def parse_ply(filepath: Path) -> PlyFile:
         <vertex line(s)>
         <face line(s)>
     """
-    header = []
-    vertices = []
-    faces = []
-    with filepath.open(mode="r") as f:
-        in_header = True
-        n_vertices = None
-        vertex_counter = 1
-        for line in f:
-            if in_header:
-                # Header assumed to span from the beginning of the file until "end_header" is
-                # encountered
-                if "end_header" in line:
-                    in_header = False
-
-                # Check for the line that tells us how many vertices are present
-                # e.g. "element vertex 10777"
-                if "element vertex" in line:
-                    n_vertices = int(line.split()[-1])
-
-                header.append(line)
-                continue
-
-            if vertex_counter <= n_vertices:
-                # Vertex lines assumed to be X, Y, Z, Confidence, all as float
-                vertices.append([float(val) for val in line.split()])
-                vertex_counter += 1
-            else:
-                faces.append(line)
+    # Empty files can't be memory-mapped
+    if filepath.stat().st_size == 0:
+        return PlyFile([], parse_vertex_block(b"", usecols=(0, 1, 2, 3)), [])
+
+    with filepath.open(mode="rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Header assumed to span from the beginning of the file until "end_header" is encountered
+        end_header = mm.find(b"end_header")
+        header_end = len(mm) if end_header < 0 else find_line_end(mm, end_header, 1)
+        header = decode_lines(mm[:header_end])
+
+        # Check for the line that tells us how many vertices are present
+        # e.g. "element vertex 10777"
+        n_vertices = 0
+        for line in header:
+            if "element vertex" in line:
+                n_vertices = int(line.split()[-1])
+
+        # Vertex lines assumed to be X, Y, Z, Confidence, all as float
+        # Hand the whole vertex block off in one shot rather than converting line by line
+        vertex_end = find_line_end(mm, header_end, n_vertices)
+        vertices = parse_vertex_block(mm[header_end:vertex_end], usecols=(0, 1, 2, 3))
+
+        # Everything after the vertices is assumed to be faces
+        faces = decode_lines(mm[vertex_end:])
 
     return PlyFile(header, vertices, faces)
+
+
+def transform_ply(
+    in_filepath: Path, out_filepath: Path, factor: float, header_comment: str
+) -> None:
+    """
+    Scale the vertices of the PLY file at `in_filepath` by `factor` & write it to `out_filepath`.
+
+    This is equivalent to parsing, scaling, commenting, and writing a `PlyFile`, but is done in a
+    single streaming pass so the full vertex array is never held in memory. Header & face lines
+    are copied through as-is, other than line endings being normalized to `"\\n"`.
+
+    NOTE: If `out_filepath` already exists, all existing contents will be overwritten.
+    """
+    with in_filepath.open(mode="rb") as in_f, out_filepath.open(
+        mode="wb", buffering=OUTPUT_BUFFER_SIZE
+    ) as out_f:
+        n_vertices = 0
+        for line in in_f:
+            # Check for the line that tells us how many vertices are present
+            # e.g. "element vertex 10777"
+            if b"element vertex" in line:
+                n_vertices = int(line.split()[-1])
+
+            # Comment goes before the "end header" statement
+            if b"end_header" in line:
+                out_f.write(f"comment {header_comment}\n".encode())
+                out_f.write(normalize_newlines(line))
+                break
+
+            out_f.write(normalize_newlines(line))
+
+        for vertex_block in iter_line_blocks(in_f, n_vertices):
+            write_scaled_vertices(out_f, vertex_block, (0, 1, 2, 3), factor, VERTEX_FORMAT)
+
+        # Everything after the vertices is assumed to be faces
+        copy_normalized(in_f, out_f)
@@ -1,29 +1,23 @@
+import multiprocessing
+import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, NamedTuple, Optional
+from typing import Iterator, Optional, TYPE_CHECKING, Tuple
 
 import click
 import click_pathlib
-from pint import UnitRegistry
-from scan_scaler.obj_scaler import parse_obj
-from scan_scaler.ply_scaler import parse_ply
+from scan_scaler.obj_scaler import transform_obj
+from scan_scaler.ply_scaler import transform_ply
 
+if TYPE_CHECKING:
+    from pint import UnitRegistry
 
-# Initialize a Quantity instance from Pint's default list of units and prefixes
-# This is used to determine the scaling factor from the input unit of measurement strings
-Q_ = UnitRegistry().Quantity
 
-
-class ScanFileList(NamedTuple):
-    """Helper container for filepaths to scans for scaling."""
-
-    obj: List[Path]
-    ply: List[Path]
-
-    @property
-    def n_scans(self) -> int:
-        """Calculate the total number of scans in the container."""
-        return len(self.obj) + len(self.ply)
+# Map scan types to their respective single-pass scaling functions
+SCAN_TRANSFORMS = {"obj": transform_obj, "ply": transform_ply}
 
 
 @click.command()
@@ -52,28 +46,62 @@ def main_cli(
 ) -> None:
     """CLI glue for obj_scaler & ply_scaler."""
     scale_factor = calc_scale_factor(in_unit, out_unit)
-    files_to_scale = find_scans(filepath, recurse, skip)
-    print(f"Scaling from '{in_unit}' to '{out_unit}' (Factor: {scale_factor:.3})")
-    print(f"Discovered {files_to_scale.n_scans} scan(s)\n")
-
-    for obj_filepath in files_to_scale.obj:
-        obj = parse_obj(obj_filepath)
-        obj.scale_vertices(scale_factor)
-        obj.add_header_comment(out_unit)
-        obj.to_file(generate_output_filename(obj_filepath, out_unit))
-        print(f"Scaled: {obj_filepath}")
-
-    for ply_filepath in files_to_scale.ply:
-        ply = parse_ply(ply_filepath)
-        ply.scale_vertices(scale_factor)
-        ply.add_header_comment(out_unit)
-        ply.to_file(generate_output_filename(ply_filepath, out_unit))
-        print(f"Scaled: {ply_filepath}")
-
-
-def find_scans(filepath: Path, recurse: bool, skip: Optional[str]) -> ScanFileList:
+    print(f"Scaling from '{in_unit}' to '{out_unit}' (Factor: {scale_factor:.3})\n")
+
+    scans = find_scans(filepath, recurse, skip, out_unit)
+
+    # Peek ahead so a lone scan is scaled in-process rather than spinning up a full process pool
+    first_scans = list(islice(scans, 2))
+    if len(first_scans) < 2:
+        for scan_filepath, kind in first_scans:
+            print(f"Scaled: {process_scan(scan_filepath, kind, scale_factor, out_unit)}")
+
+        print(f"\nScaled {len(first_scans)} scan(s)")
+        return
+
+    # Each scan is independent, so farm them out across processes to sidestep the GIL
+    # Scans are submitted as they're discovered so the directory walk overlaps with scaling
+    futures = []
+    with ProcessPoolExecutor() as executor:
+        for scan_filepath, kind in chain(first_scans, scans):
+            futures.append(
+                executor.submit(process_scan, scan_filepath, kind, scale_factor, out_unit)
+            )
+
+        for future in as_completed(futures):
+            print(f"Scaled: {future.result()}")
+
+    print(f"\nScaled {len(futures)} scan(s)")
+
+
+def process_scan(filepath: Path, kind: str, scale_factor: float, out_unit: str) -> Path:
+    """
+    Scale the provided scan file of the specified `kind` (`"obj"` or `"ply"`).
+
+    The scaled scan is written alongside the original, with the outgoing unit of measurement
+    appended to its filename. The input `filepath` is returned for progress reporting.
+    """
+    SCAN_TRANSFORMS[kind](
+        filepath, generate_output_filename(filepath, out_unit), scale_factor, out_unit
+    )
+    return filepath
+
+
+def find_scans(
+    filepath: Path, recurse: bool, skip: Optional[str], out_unit: Optional[str] = None
+) -> Iterator[Tuple[Path, str]]:
     """
-    Identify OBJ and PLY scan(s) available for scaling.
+    Lazily identify OBJ and PLY scan(s) available for scaling.
+
+    Scans are yielded as `(filepath, kind)` tuples as they're discovered, where `kind` is either
+    `"obj"` or `"ply"`.
+
+    If `out_unit` is provided, scans discovered in a directory are assumed to be previously scaled
+    outputs & are skipped if their filenames end in `_<out_unit>` and the scan they would have been
+    generated from exists alongside them (e.g. `some_scan_mm.ply` next to `some_scan.ply`). Since
+    scaled scans are written alongside the originals while the directory is still being walked,
+    this keeps the CLI's own outputs from being picked back up, regardless of the order the walk
+    happens to see them in.
 
     If the `recurse` flag is `True`:
         * If `filepath` is a directory, scans will be identified recursively using rglob
@@ -84,42 +112,63 @@ def find_scans(filepath: Path, recurse: bool, skip: Optional[str]) -> ScanFileLi
         * If `filepath` is a file, only that file will be considered
 
     Note: To simplify path case-sensitivity considerations for operating systems that are not
-    Windows, scan file extensions are assumed to always be lowercase (`".obj"` or `".ply"`).
+    Windows, scan file extensions are assumed to always be lowercase (`".obj"` or `".ply"`). On
+    Windows, extensions are matched case-insensitively.
     """
-    scan_files = ScanFileList([], [])
+    kinds = {"obj", "ply"}
+    if skip:
+        kinds.discard(skip.lower())
 
     if filepath.is_file():
         # Single file presented
         if recurse:
             warnings.warn("Ignoring recursion flag for single-file input", UserWarning)
 
-        if filepath.suffix.lower() == ".obj":
-            scan_files.obj.append(filepath)
-        elif filepath.suffix.lower() == ".ply":
-            scan_files.ply.append(filepath)
+        kind = filepath.suffix.lower().lstrip(".")
+        if kind in kinds:
+            yield filepath, kind
     else:
         # Directory presented
-        if recurse:
-            scan_files.obj.extend(filepath.rglob("*.obj"))
-            scan_files.ply.extend(filepath.rglob("*.ply"))
-        else:
-            scan_files.obj.extend(filepath.glob("*.obj"))
-            scan_files.ply.extend(filepath.glob("*.ply"))
-
-    # Rather than adding a bunch of logic flow to the file parsing itself, let's be lazy and just
-    # dump out the files at the end.
-    if skip:
-        if skip.lower() == "obj":
-            scan_files.obj = []
-        elif skip.lower() == "ply":
-            scan_files.ply = []
+        # Walk the directory once & sort out scan types by extension as we go
+        candidates = filepath.rglob("*") if recurse else filepath.glob("*")
+        for candidate in candidates:
+            # normcase lowercases on Windows only, matching glob's case-sensitivity on each OS
+            kind = os.path.normcase(candidate.suffix).lstrip(".")
+            if kind not in kinds:
+                continue
+
+            if out_unit and is_scaled_output(candidate, out_unit):
+                continue
+
+            yield candidate, kind
+
+
+def is_scaled_output(filepath: Path, out_unit: str) -> bool:
+    """Check whether the provided scan looks to have been generated from a sibling scan file."""
+    suffix = f"_{out_unit}"
+    if not filepath.stem.endswith(suffix):
+        return False
+
+    source_filename = f"{filepath.stem[: -len(suffix)]}{filepath.suffix}"
+    return filepath.with_name(source_filename).exists()
+
+
+@lru_cache(maxsize=None)
+def unit_registry() -> "UnitRegistry":
+    """
+    Initialize a unit registry from Pint's default list of units and prefixes.
+
+    Loading the registry is relatively expensive, so it's deferred until it's first needed &
+    reused for subsequent calls.
+    """
+    from pint import UnitRegistry
 
-    return scan_files
+    return UnitRegistry()
 
 
 def calc_scale_factor(in_unit: str, out_unit: str) -> float:
     """Calculate the scale factor between the two units of measurement provided."""
-    return Q_(in_unit).to(out_unit).magnitude
+    return unit_registry().Quantity(in_unit).to(out_unit).magnitude
 
 
 def generate_output_filename(filepath: Path, out_unit: str) -> Path:
@@ -129,4 +178,7 @@ def generate_output_filename(filepath: Path, out_unit: str) -> Path:
 
 
 if __name__ == "__main__":
+    # Required for the process pool to work in frozen Windows executables, otherwise each worker
+    # re-runs the CLI rather than the worker target
+    multiprocessing.freeze_support()
     main_cli()
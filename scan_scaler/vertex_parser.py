@@ -0,0 +1,204 @@
+import io
+import locale
+from typing import BinaryIO, Iterator, List, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    # pandas is an optional speedup; fall back to NumPy's parser if it's not available
+    pd = None
+
+try:
+    from scan_scaler._fast_io import parse_vertices
+except ImportError:
+    # The compiled extension is optional; fall back to NumPy/pandas if it hasn't been built
+    parse_vertices = None
+
+# NumPy's loadtxt was reimplemented in C in v1.23, after which it outpaces pandas' read_csv. It
+# also has a much lower fixed cost per call, which adds up quickly over a batch of small scans.
+HAS_C_LOADTXT = tuple(int(part) for part in np.__version__.split(".")[:2]) >= (1, 23)
+
+# Number of bytes of vertex lines to read at a time when streaming a scan file; this works out to
+# roughly a tile's worth of vertices for typical ASCII scans
+VERTEX_BLOCK_SIZE = 1 << 17
+
+# Vertices are only output to 5 significant figures, so single precision is plenty & halves the
+# memory traffic of the scale & format steps
+VERTEX_DTYPE = np.float32
+
+# Number of vertices processed at a time when scaling & formatting. Tiles are kept small enough
+# that the parsed vertices stay cache-resident between the scale & format steps.
+VERTEX_TILE_SIZE = 4096
+
+# Scaled scans are written through a larger buffer than the default to cut down on write calls
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Newline scanning is done in chunks so we don't materialize a mask the size of the whole file
+NEWLINE_SCAN_CHUNK = 1 << 22
+
+
+def parse_vertex_block(block: bytes, usecols: Tuple[int, ...]) -> np.ndarray:
+    """
+    Bulk parse the provided whitespace-delimited vertex `block` into an `(N, len(usecols))` array.
+
+    If the compiled `_fast_io` extension is available it's used for the ASCII -> float conversion,
+    in which case `usecols` must be a contiguous run of columns. The extension's parser follows the
+    C numeric locale, so it's only used while the locale's decimal point is `"."`. Otherwise NumPy's
+    `loadtxt` is used, unless the installed NumPy predates its C implementation & pandas is
+    available, in which case pandas' C CSV engine is used.
+    """
+    if not block.strip():
+        return np.empty((0, len(usecols)), dtype=VERTEX_DTYPE)
+
+    if parse_vertices is not None and locale.localeconv()["decimal_point"] == ".":
+        # The extension always parses to single precision
+        return parse_vertices(block, usecols[0], len(usecols)).astype(VERTEX_DTYPE, copy=False)
+
+    if pd is not None and not HAS_C_LOADTXT:
+        return pd.read_csv(
+            io.BytesIO(block),
+            sep=r"\s+",
+            header=None,
+            usecols=usecols,
+            dtype=VERTEX_DTYPE,
+            engine="c",
+            # The default "high" precision parser doesn't round-trip, so values can differ from
+            # what NumPy parses
+            float_precision="round_trip",
+        ).to_numpy()
+    else:
+        return np.loadtxt(io.BytesIO(block), dtype=VERTEX_DTYPE, usecols=usecols, ndmin=2)
+
+
+def find_line_end(buffer: bytes, start: int, n_lines: int) -> int:
+    """
+    Find the offset just past the end of the `n_lines`-th line of `buffer` following `start`.
+
+    If `buffer` runs out before `n_lines` newlines are found, the length of `buffer` is returned.
+    """
+    pos = start
+    remaining = n_lines
+    while remaining and pos < len(buffer):
+        chunk = np.frombuffer(
+            buffer, dtype=np.uint8, count=min(NEWLINE_SCAN_CHUNK, len(buffer) - pos), offset=pos
+        )
+        newlines = np.flatnonzero(chunk == ord("\n"))
+        if len(newlines) >= remaining:
+            return pos + int(newlines[remaining - 1]) + 1
+
+        remaining -= len(newlines)
+        pos += len(chunk)
+
+    return min(pos, len(buffer))
+
+
+def iter_line_blocks(
+    f: BinaryIO, n_lines: int, block_size: int = VERTEX_BLOCK_SIZE
+) -> Iterator[bytes]:
+    """
+    Yield blocks of complete lines read from `f`, totalling up to `n_lines` lines.
+
+    Blocks are read in bulk & trimmed to line boundaries rather than splitting out each line
+    individually. Once exhausted, `f` is positioned immediately after the last line yielded.
+    """
+    remaining = n_lines
+    while remaining > 0:
+        block = f.read(block_size)
+        if not block:
+            return
+
+        # Finish off the current line so it isn't split across blocks
+        if not block.endswith(b"\n"):
+            block += f.readline()
+
+        # Trim off anything past the final line we're after & rewind so it can be read again
+        end = find_line_end(block, 0, remaining)
+        remaining -= block.count(b"\n", 0, end)
+        f.seek(end - len(block), io.SEEK_CUR)
+
+        yield block[:end]
+
+
+def normalize_newlines(data: bytes) -> bytes:
+    """Normalize all line endings in the provided `data` to `"\\n"`, as Python's text mode does."""
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def copy_normalized(in_f: BinaryIO, out_f: BinaryIO, chunk_size: int = OUTPUT_BUFFER_SIZE) -> None:
+    """Copy the remaining contents of `in_f` to `out_f`, normalizing line endings to `"\\n"`."""
+    while True:
+        chunk = in_f.read(chunk_size)
+        if not chunk:
+            return
+
+        # Don't split a "\r\n" pair across chunks
+        while chunk.endswith(b"\r"):
+            next_byte = in_f.read(1)
+            if not next_byte:
+                break
+
+            chunk += next_byte
+
+        out_f.write(normalize_newlines(chunk))
+
+
+def find_line_starts(buffer: bytes) -> np.ndarray:
+    """Find the offset of the start of each line in `buffer`."""
+    starts = [np.zeros(1, dtype=np.intp)]
+    for pos in range(0, len(buffer), NEWLINE_SCAN_CHUNK):
+        chunk = np.frombuffer(
+            buffer, dtype=np.uint8, count=min(NEWLINE_SCAN_CHUNK, len(buffer) - pos), offset=pos
+        )
+        starts.append(np.flatnonzero(chunk == ord("\n")) + pos + 1)
+
+    # A trailing newline doesn't start another line
+    line_starts = np.concatenate(starts)
+    return line_starts[line_starts < len(buffer)]
+
+
+def join_lines(buffer: bytes, line_starts: np.ndarray, selected: np.ndarray) -> bytes:
+    """
+    Join the lines of `buffer` flagged by the boolean `selected` mask into a single block.
+
+    `line_starts` are the line offsets as given by `find_line_starts`. Runs of consecutive selected
+    lines are copied out as a single slice, rather than splitting out each line individually.
+    """
+    selected_lines = np.flatnonzero(selected)
+    if not len(selected_lines):
+        return b""
+
+    line_ends = np.append(line_starts[1:], len(buffer))
+    breaks = np.flatnonzero(np.diff(selected_lines) != 1) + 1
+    run_starts = line_starts[selected_lines[np.insert(breaks, 0, 0)]]
+    run_ends = line_ends[selected_lines[np.append(breaks - 1, len(selected_lines) - 1)]]
+    return b"".join(buffer[start:end] for start, end in zip(run_starts.tolist(), run_ends.tolist()))
+
+
+def decode_lines(buffer: bytes) -> List[str]:
+    """Decode the provided `buffer` into a list of lines, normalizing line endings to `"\\n"`."""
+    return list(io.StringIO(buffer.decode(), newline=None))
+
+
+def write_scaled_vertices(
+    out_f: BinaryIO, block: bytes, usecols: Tuple[int, ...], factor: float, fmt: str
+) -> None:
+    """
+    Parse the provided vertex `block`, scale it by `factor`, and write it to `out_f` using `fmt`.
+
+    Only the first 3 (X, Y, Z) components of each vertex are scaled.
+    """
+    vertices = parse_vertex_block(block, usecols)
+    vertices[:, :3] *= factor
+    out_f.write(format_vertices(vertices, fmt))
+
+
+def format_vertices(vertices: np.ndarray, fmt: str) -> bytes:
+    """
+    Convert the provided `vertices` into their encoded string representation, one line per vertex.
+
+    Each vertex is formatted using the `%`-style `fmt`; the whole array is formatted in a single
+    operation, so callers should pass in vertices a tile at a time rather than a full scan.
+    """
+    return f"{fmt}\n".encode() * len(vertices) % tuple(vertices.ravel().tolist())
@@ -0,0 +1,23 @@
+import pytest
+from scan_scaler import vertex_parser
+
+
+@pytest.fixture
+def no_fast_io(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Disable the compiled extension so `parse_vertex_block` uses its NumPy/pandas fallback."""
+    monkeypatch.setattr(vertex_parser, "parse_vertices", None)
+
+
+@pytest.fixture(params=["loadtxt", "pandas"])
+def fallback_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Force `parse_vertex_block` to use each of its fallback parsers in turn."""
+    monkeypatch.setattr(vertex_parser, "parse_vertices", None)
+    if request.param == "pandas":
+        if vertex_parser.pd is None:
+            pytest.skip("pandas is not installed")
+
+        monkeypatch.setattr(vertex_parser, "HAS_C_LOADTXT", False)
+    else:
+        monkeypatch.setattr(vertex_parser, "pd", None)
+
+    return request.param
@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pytest
+from scan_scaler import vertex_parser
+
+_fast_io = pytest.importorskip("scan_scaler._fast_io")
+
+PLY_COLS = (0, 1, 2, 3)
+OBJ_COLS = (1, 2, 3)
+
+VALID_BLOCKS = (
+    (b"1 2 3 4\n-1.5 2.25e-3 3E2 0.5\n", PLY_COLS),
+    (b"1 2 3 4\r\n5 6 7 8\r\n", PLY_COLS),
+    (b"1 2 3 4\n\n  \n5 6 7 8", PLY_COLS),
+    (b"\t1  2\t3 4 9 9\n5 6 7 8 9 9\n", PLY_COLS),
+    (b"0.123456789 1.0000001 -0 1e-40\n", PLY_COLS),
+    (b"v 1 2 3\nv -4.5 5.25 6e1\n", OBJ_COLS),
+    (b"v 1 2 3\r\nv 4 5 6", OBJ_COLS),
+)
+
+MALFORMED_BLOCKS = (
+    (b"1-2 3 4 5\n", PLY_COLS),
+    (b"1.2.3 4 5 6\n", PLY_COLS),
+    (b"1 2 3 4abc\n", PLY_COLS),
+    (b"1 2 3\n", PLY_COLS),
+    (b"1 2 x 4\n", PLY_COLS),
+    (b"v 1 2\nv 4 5 6\n", OBJ_COLS),
+)
+
+
+def parse_fast(block: bytes, usecols: tuple) -> np.ndarray:
+    """Parse the provided block with the compiled extension."""
+    return _fast_io.parse_vertices(block, usecols[0], len(usecols))
+
+
+def parse_loadtxt(block: bytes, usecols: tuple) -> np.ndarray:
+    """Parse the provided block with NumPy's `loadtxt`, the reference fallback parser."""
+    return np.loadtxt(io.BytesIO(block), dtype=vertex_parser.VERTEX_DTYPE, usecols=usecols, ndmin=2)
+
+
+@pytest.mark.parametrize(("block", "usecols"), VALID_BLOCKS)
+def test_valid_matches_fallback(block: bytes, usecols: tuple) -> None:
+    """Check that the extension parses valid blocks identically to the fallback."""
+    fast = parse_fast(block, usecols)
+
+    assert fast.dtype == vertex_parser.VERTEX_DTYPE
+    np.testing.assert_array_equal(fast, parse_loadtxt(block, usecols))
+
+
+@pytest.mark.parametrize(("block", "usecols"), MALFORMED_BLOCKS)
+def test_malformed_raises(block: bytes, usecols: tuple) -> None:
+    """Check that the extension rejects the same malformed blocks as the fallback."""
+    with pytest.raises(ValueError):
+        parse_fast(block, usecols)
+
+    with pytest.raises(ValueError):
+        parse_loadtxt(block, usecols)
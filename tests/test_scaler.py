@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+from scan_scaler.scaler import calc_scale_factor, find_scans, generate_output_filename
+
+
+def test_find_scans_skips_prior_outputs(tmp_path: Path) -> None:
+    """Check that only scans generated from a sibling scan are treated as prior outputs."""
+    for filename in ("room.obj", "room_mm.obj", "part_mm.ply", "notes.txt"):
+        (tmp_path / filename).touch()
+
+    found = {filepath.name: kind for filepath, kind in find_scans(tmp_path, False, None, "mm")}
+
+    assert found == {"room.obj": "obj", "part_mm.ply": "ply"}
+
+
+def test_find_scans_recurse_and_skip(tmp_path: Path) -> None:
+    """Check that recursion picks up nested scans & skipped scan types are left out."""
+    (tmp_path / "nested").mkdir()
+    for filename in ("top.ply", "top.obj", "nested/deep.ply", "nested/deep.obj"):
+        (tmp_path / filename).touch()
+
+    found = {filepath.relative_to(tmp_path) for filepath, _ in find_scans(tmp_path, True, "OBJ")}
+    assert found == {Path("top.ply"), Path("nested/deep.ply")}
+
+    found = {filepath.relative_to(tmp_path) for filepath, _ in find_scans(tmp_path, False, None)}
+    assert found == {Path("top.ply"), Path("top.obj")}
+
+
+def test_find_scans_single_file(tmp_path: Path) -> None:
+    """Check that a single file is yielded as-is & the recursion flag is ignored with a warning."""
+    filepath = tmp_path / "part_mm.ply"
+    filepath.touch()
+
+    with pytest.warns(UserWarning):
+        found = list(find_scans(filepath, True, None, "mm"))
+
+    assert found == [(filepath, "ply")]
+
+
+def test_generate_output_filename() -> None:
+    """Check that the outgoing unit of measurement is appended to the filename."""
+    assert generate_output_filename(Path("scans/some_scan.ply"), "mm") == Path(
+        "scans/some_scan_mm.ply"
+    )
+
+
+def test_calc_scale_factor() -> None:
+    """Check the scale factor between two units of measurement."""
+    assert calc_scale_factor("m", "mm") == pytest.approx(1000)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scan_scaler.obj_scaler import ObjFile, parse_obj, transform_obj
+from scan_scaler.ply_scaler import PlyFile, parse_ply, transform_ply
+
+SAMPLE_PLY = (
+    b"ply\n"
+    b"format ascii 1.0\n"
+    b"element vertex 3\n"
+    b"property float x\n"
+    b"property float y\n"
+    b"property float z\n"
+    b"property float confidence\n"
+    b"element face 1\n"
+    b"property list uchar int vertex_indices\n"
+    b"end_header\n"
+    b"0.001 0.0025 -0.5 0.75\n"
+    b"1.5 2 3 1\n"
+    b"0.123456 -7.25 1e-3 0.5\n"
+    b"3 0 1 2\n"
+)
+
+SAMPLE_OBJ = (
+    b"# Exported scan\n"
+    b"v 0.001 0.0025 -0.5\n"
+    b"v 1.5 2 3\n"
+    b"# Interleaved comment\n"
+    b"f 1 2 3\n"
+    b"v 0.123456 -7.25 1e-3\n"
+    b"vn 0 0 1\n"
+    b"g group\n"
+    b"f 3 2 1\n"
+)
+
+
+def crlf(contents: bytes) -> bytes:
+    """Convert the provided `contents` to Windows line endings."""
+    return contents.replace(b"\n", b"\r\n")
+
+
+@pytest.mark.parametrize("contents", (SAMPLE_PLY, crlf(SAMPLE_PLY)), ids=("lf", "crlf"))
+def test_transform_ply_matches_to_file(tmp_path: Path, contents: bytes) -> None:
+    """Check that streaming a PLY file gives the same output as parsing it in full."""
+    in_filepath = tmp_path / "scan.ply"
+    in_filepath.write_bytes(contents)
+
+    ply = parse_ply(in_filepath)
+    ply.scale_vertices(1000)
+    ply.add_header_comment("mm")
+    ply.to_file(tmp_path / "parsed.ply")
+
+    transform_ply(in_filepath, tmp_path / "streamed.ply", 1000, "mm")
+
+    streamed = (tmp_path / "streamed.ply").read_bytes()
+    assert streamed == (tmp_path / "parsed.ply").read_bytes()
+    assert b"comment mm\nend_header\n1 2.5 -500  0.75\n" in streamed
+
+
+@pytest.mark.parametrize("contents", (SAMPLE_OBJ, crlf(SAMPLE_OBJ)), ids=("lf", "crlf"))
+def test_transform_obj_matches_to_file(tmp_path: Path, contents: bytes) -> None:
+    """Check that streaming an OBJ file gives the same output as parsing it in full."""
+    in_filepath = tmp_path / "scan.obj"
+    in_filepath.write_bytes(contents)
+
+    obj = parse_obj(in_filepath)
+    obj.scale_vertices(1000)
+    obj.add_header_comment("mm")
+    obj.to_file(tmp_path / "parsed.obj")
+
+    transform_obj(in_filepath, tmp_path / "streamed.obj", 1000, "mm")
+
+    streamed = (tmp_path / "streamed.obj").read_bytes()
+    assert streamed == (tmp_path / "parsed.obj").read_bytes()
+    assert streamed == (
+        b"# Exported scan\n"
+        b"# Interleaved comment\n"
+        b"# mm\n"
+        b"v 1 2.5 -500\n"
+        b"v 1500 2000 3000\n"
+        b"v 123.46 -7250 1\n"
+        b"v 0 0 1000\n"
+        b"f 1 2 3\n"
+        b"f 3 2 1\n"
+    )
+
+
+def test_parse_empty_files(tmp_path: Path) -> None:
+    """Check that empty scan files parse to empty containers rather than failing to be mapped."""
+    (tmp_path / "empty.ply").touch()
+    (tmp_path / "empty.obj").touch()
+
+    assert parse_ply(tmp_path / "empty.ply") == PlyFile([], np.empty((0, 4)), [])
+    assert parse_obj(tmp_path / "empty.obj") == ObjFile([], np.empty((0, 3)), [])
+
+
+def test_scale_integer_vertices() -> None:
+    """Check that vertices provided as integers are scaled without truncation."""
+    ply = PlyFile(["end_header\n"], np.array([[1500, 2500, 3500, 1]]), [])
+    ply.scale_vertices(0.001)
+
+    np.testing.assert_allclose(ply.vertices, [[1.5, 2.5, 3.5, 1]])
@@ -0,0 +1,116 @@
+import io
+
+import numpy as np
+import pytest
+from scan_scaler import vertex_parser
+
+PLY_COLS = (0, 1, 2, 3)
+OBJ_COLS = (1, 2, 3)
+
+VALID_BLOCKS = (
+    (b"1 2 3 4\n-1.5 2.25e-3 3E2 0.5\n", PLY_COLS, [[1, 2, 3, 4], [-1.5, 2.25e-3, 3e2, 0.5]]),
+    (b"1 2 3 4\r\n5 6 7 8\r\n", PLY_COLS, [[1, 2, 3, 4], [5, 6, 7, 8]]),
+    (b"1 2 3 4\n\n  \n5 6 7 8", PLY_COLS, [[1, 2, 3, 4], [5, 6, 7, 8]]),
+    (b"\t1  2\t3 4 9 9\n5 6 7 8 9 9\n", PLY_COLS, [[1, 2, 3, 4], [5, 6, 7, 8]]),
+    (b"v 1 2 3\nv -4.5 5.25 6e1\n", OBJ_COLS, [[1, 2, 3], [-4.5, 5.25, 60]]),
+    (b"v 1 2 3\r\nv 4 5 6", OBJ_COLS, [[1, 2, 3], [4, 5, 6]]),
+)
+
+MALFORMED_BLOCKS = (
+    (b"1-2 3 4 5\n", PLY_COLS),
+    (b"1.2.3 4 5 6\n", PLY_COLS),
+    (b"1 2 3 4abc\n", PLY_COLS),
+    (b"1 2 3\n", PLY_COLS),
+    (b"1 2 x 4\n", PLY_COLS),
+)
+
+
+@pytest.mark.parametrize(("block", "usecols", "truth_vertices"), VALID_BLOCKS)
+def test_fallback_parse(
+    fallback_backend: str, block: bytes, usecols: tuple, truth_vertices: list
+) -> None:
+    """Check that both fallback parsers handle the line endings & spacing seen in scan files."""
+    vertices = vertex_parser.parse_vertex_block(block, usecols)
+
+    assert vertices.dtype == vertex_parser.VERTEX_DTYPE
+    np.testing.assert_array_equal(vertices, np.array(truth_vertices, dtype=np.float32))
+
+
+@pytest.mark.parametrize(("block", "usecols"), MALFORMED_BLOCKS)
+def test_fallback_malformed_raises(no_fast_io: None, block: bytes, usecols: tuple) -> None:
+    """Check that NumPy's parser rejects values that aren't whitespace-delimited floats."""
+    with pytest.raises(ValueError):
+        vertex_parser.parse_vertex_block(block, usecols)
+
+
+def test_empty_block(no_fast_io: None) -> None:
+    """Check that an empty block parses to an empty array of the right width."""
+    vertices = vertex_parser.parse_vertex_block(b"\n", PLY_COLS)
+
+    assert vertices.shape == (0, 4)
+    assert vertices.dtype == vertex_parser.VERTEX_DTYPE
+
+
+def test_non_dot_locale_uses_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check that the extension isn't used under a locale whose decimal point isn't `"."`."""
+
+    def fail(*args: object) -> None:
+        raise AssertionError("Extension used with a non-'.' decimal point")
+
+    monkeypatch.setattr(vertex_parser, "parse_vertices", fail)
+    monkeypatch.setattr(vertex_parser.locale, "localeconv", lambda: {"decimal_point": ","})
+
+    np.testing.assert_array_equal(
+        vertex_parser.parse_vertex_block(b"1 2 3 4\n", PLY_COLS), [[1, 2, 3, 4]]
+    )
+
+
+LINE_SPLIT_CASES = (
+    b"# a\r\nv 1 2 3\r\nf 1 2 3\r\n",
+    b"v 1 2 3",
+    b"\n\n# x\nv 1 2 3\n# y\nf 1\nv 4 5 6\nf 2",
+    b"\n",
+)
+
+
+@pytest.mark.parametrize("buffer", LINE_SPLIT_CASES)
+def test_join_lines(buffer: bytes) -> None:
+    """Check that bulk line selection matches splitting out each line individually."""
+    line_starts = vertex_parser.find_line_starts(buffer)
+    line_types = np.frombuffer(buffer, dtype=np.uint8)[line_starts]
+
+    for prefix in (b"#", b"v", b"f"):
+        truth = b"".join(
+            line for line in buffer.splitlines(keepends=True) if line.startswith(prefix)
+        )
+        assert vertex_parser.join_lines(buffer, line_starts, line_types == ord(prefix)) == truth
+
+
+def test_iter_line_blocks() -> None:
+    """Check that line blocks stop at the requested line count & leave the file positioned after."""
+    f = io.BytesIO(b"".join(f"{i} 0 0 1\n".encode() for i in range(100)) + b"3 0 1 2\n")
+
+    blocks = list(vertex_parser.iter_line_blocks(f, 100, block_size=64))
+
+    assert all(block.endswith(b"\n") for block in blocks)
+    assert b"".join(blocks).count(b"\n") == 100
+    assert f.read() == b"3 0 1 2\n"
+
+
+def test_copy_normalized() -> None:
+    """Check that line endings are normalized, including a CRLF pair split across chunks."""
+    in_f = io.BytesIO(b"a\r\nb\rc\nd\r\n")
+    out_f = io.BytesIO()
+
+    vertex_parser.copy_normalized(in_f, out_f, chunk_size=2)
+
+    assert out_f.getvalue() == b"a\nb\nc\nd\n"
+
+
+def test_format_vertices() -> None:
+    """Check that a tile of vertices is formatted one line per vertex."""
+    vertices = np.array([[1, 2.5, 3], [1000.004, -0.5, 6]], dtype=np.float32)
+
+    assert vertex_parser.format_vertices(vertices, "v %.5g %.5g %.5g") == (
+        b"v 1 2.5 3\nv 1000 -0.5 6\n"
+    )